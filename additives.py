@@ -0,0 +1,181 @@
+import re
+from collections import deque
+
+# Additives commonly found on packaged food labels with a risk weight, which is
+# subtracted from a starting score of 100 when the additive is found.
+#   (name, E-number, category, weight, other names on labels)
+ADDITIVES = [
+    # Preservatives
+    ("Sodium benzoate", "E211", "Preservative", 15, []),
+    ("Benzoic acid", "E210", "Preservative", 10, []),
+    ("Potassium benzoate", "E212", "Preservative", 10, []),
+    ("Sorbic acid", "E200", "Preservative", 5, []),
+    ("Potassium sorbate", "E202", "Preservative", 5, []),
+    ("Sulphur dioxide", "E220", "Preservative", 10, ["sulfur dioxide"]),
+    ("Sodium metabisulphite", "E223", "Preservative", 10, ["sodium metabisulfite"]),
+    ("Potassium metabisulphite", "E224", "Preservative", 10, ["potassium metabisulfite"]),
+    ("Sodium nitrite", "E250", "Preservative", 20, []),
+    ("Sodium nitrate", "E251", "Preservative", 20, []),
+    ("Potassium nitrate", "E252", "Preservative", 15, []),
+    ("Propyl gallate", "E310", "Antioxidant", 10, []),
+    ("TBHQ", "E319", "Antioxidant", 15, ["tertiary butylhydroquinone", "tert butylhydroquinone"]),
+    ("BHA", "E320", "Antioxidant", 20, ["butylated hydroxyanisole"]),
+    ("BHT", "E321", "Antioxidant", 15, ["butylated hydroxytoluene"]),
+    # Colours
+    ("Tartrazine", "E102", "Colour", 15, []),
+    ("Sunset yellow", "E110", "Colour", 15, ["sunset yellow fcf"]),
+    ("Carmoisine", "E122", "Colour", 15, ["azorubine"]),
+    ("Ponceau 4R", "E124", "Colour", 15, []),
+    ("Allura red", "E129", "Colour", 15, ["allura red ac"]),
+    ("Brilliant blue", "E133", "Colour", 10, ["brilliant blue fcf"]),
+    ("Caramel colour", "E150d", "Colour", 10, ["caramel color", "sulphite ammonia caramel"]),
+    ("Titanium dioxide", "E171", "Colour", 15, []),
+    ("Artificial colour", None, "Colour", 10, ["artificial color", "artificial colours", "artificial colors",
+                                               "synthetic food colour", "synthetic food color"]),
+    # Sweeteners
+    ("Sorbitol", "E420", "Sweetener", 5, []),
+    ("Acesulfame potassium", "E950", "Sweetener", 10, ["acesulfame k", "ace k"]),
+    ("Aspartame", "E951", "Sweetener", 15, []),
+    ("Sodium cyclamate", "E952", "Sweetener", 10, ["cyclamate"]),
+    ("Saccharin", "E954", "Sweetener", 10, []),
+    ("Sucralose", "E955", "Sweetener", 10, []),
+    ("Maltitol", "E965", "Sweetener", 5, []),
+    ("High fructose corn syrup", None, "Sweetener", 15, ["hfcs", "glucose fructose syrup", "fructose glucose syrup"]),
+    ("Corn syrup", None, "Sweetener", 10, ["glucose syrup", "liquid glucose"]),
+    ("Invert sugar", None, "Sweetener", 5, ["invert syrup", "invert sugar syrup"]),
+    ("Maltodextrin", None, "Sweetener", 5, []),
+    # Flavour enhancers
+    ("Monosodium glutamate", "E621", "Flavour enhancer", 10, ["msg"]),
+    ("Disodium guanylate", "E627", "Flavour enhancer", 5, []),
+    ("Disodium inosinate", "E631", "Flavour enhancer", 5, []),
+    ("Artificial flavour", None, "Flavour", 5, ["artificial flavor", "artificial flavouring", "artificial flavoring",
+                                                "artificial flavours", "artificial flavors",
+                                                "nature identical flavouring", "nature identical flavoring"]),
+    # Emulsifiers, stabilisers and acids
+    ("Phosphoric acid", "E338", "Acidity regulator", 10, []),
+    ("Carrageenan", "E407", "Thickener", 10, []),
+    ("Polysorbate 80", "E433", "Emulsifier", 10, []),
+    ("Carboxymethyl cellulose", "E466", "Thickener", 10, ["sodium carboxymethyl cellulose", "cellulose gum"]),
+    # Fats
+    ("Hydrogenated vegetable oil", None, "Fat", 20, ["hydrogenated oil", "hydrogenated fat", "partially hydrogenated",
+                                                      "hydrogenated vegetable fat", "vanaspati"]),
+    ("Interesterified fat", None, "Fat", 10, ["interesterified vegetable fat", "interesterified oil"]),
+    ("Palm oil", None, "Fat", 5, ["palmolein", "palm olein", "palm fat"]),
+]
+
+RISK_LEVELS = [(15, "High"), (10, "Moderate"), (0, "Low")]
+
+# Labels often give only the number after the additive class, "Preservative (211)"
+CLASS_CODES = re.compile(
+    r"\b(?:preservatives?|colou?rs?|emulsifiers?|stabili[sz]ers?|thickeners?|sweeteners?|antioxidants?|"
+    r"acidity\s+regulators?|flavou?r\s+enhancers?)\s*\(([^()]*)\)"
+)
+
+
+def add_class_codes(match):
+    codes = re.sub(r"(?<![a-z0-9])(?:(?:e|ins)[\s.-]?)?(\d{3,4}[a-z]?)\b", r"e\1", match.group(1))
+    return match.group(0).replace(match.group(1), codes)
+
+
+def normalize(text):
+    # Lower case, punctuation to single spaces and "E 211" / "INS 211" /
+    # "Preservative (211)" to "e211", so patterns and label text line up word for word
+    text = CLASS_CODES.sub(add_class_codes, text.lower())
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    text = re.sub(r"\b(?:e|ins) ?(\d{3,4}[a-z]?)\b", r"e\1", text)
+    return f" {text.strip()} "
+
+
+class AdditiveMatcher:
+    # Aho-Corasick automaton over every additive name, alias and E-number,
+    # so a label is scanned for all of them in a single pass
+
+    def __init__(self, additives):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for additive in additives:
+            name, code, _, _, aliases = additive
+            for pattern in [name, *aliases] + ([code] if code else []):
+                # Pad with spaces so matches only land on whole words
+                self.add(normalize(pattern), additive)
+        self.build()
+
+    def add(self, pattern, additive):
+        state = 0
+        for char in pattern:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append((pattern, additive))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def scan(self, text):
+        state = 0
+        matches = []
+        for end, char in enumerate(normalize(text)):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern, additive in self.output[state]:
+                # Span of the words, without the padding spaces shared by neighbours
+                matches.append((end - len(pattern) + 2, end - 1, pattern, additive))
+
+        # Keep leftmost-longest matches, so "high fructose corn syrup" is not
+        # also counted as "corn syrup"
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        last_end = -1
+        for start, end, pattern, additive in matches:
+            if start > last_end:
+                selected.append((pattern, additive))
+                last_end = end
+        return selected
+
+
+_matcher = None
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        _matcher = AdditiveMatcher(ADDITIVES)
+    return _matcher
+
+
+def risk_level(weight):
+    return next(level for threshold, level in RISK_LEVELS if weight >= threshold)
+
+
+def score_ingredients(text):
+    # Preliminary 0-100 rating from the additives found, available before the LLM responds
+    flagged = {}
+    for pattern, (name, code, category, weight, _) in get_matcher().scan(text):
+        if name not in flagged:
+            flagged[name] = {
+                "Ingredient": name,
+                "E-number": code or "-",
+                "Category": category,
+                "Risk": risk_level(weight),
+                "Found as": pattern.strip(),
+                "Weight": weight,
+            }
+
+    flagged = sorted(flagged.values(), key=lambda item: -item["Weight"])
+    score = max(0, 100 - sum(item["Weight"] for item in flagged))
+    return score, flagged
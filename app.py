@@ -28,11 +28,11 @@ def app():
         if auth_option == "Log In":
             if login():  
                 st.session_state.logged_in = True
-                st.experimental_rerun()  
+                st.rerun()  
         elif auth_option == "Sign Up":
             if sign_up():  
                 st.session_state.logged_in = True
-                st.experimental_rerun()
+                st.rerun()
 
 
     else:
@@ -47,7 +47,7 @@ def app():
         elif option == "Log Out":
             st.session_state.clear()
             st.success("You have been logged out.")
-            st.experimental_rerun()
+            st.rerun()
 
 if __name__ == "__main__":
     app()
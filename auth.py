@@ -108,8 +108,8 @@ def sign_up():
             "username": username,
             "email"         : email,
             "gender"        : gender,
-            "height"        : height,
-            "weight"        : weight,
+            "height"        : float(height),
+            "weight"        : float(weight),
             "activity_level": activity_level,
             "dob"           : datetime.combine(dob, datetime.min.time()),
             "calorie_limit" : calorie_limit,
@@ -1,6 +1,8 @@
+import io
 import os
 import pandas as pd
 import numpy as np
+import matplotlib.pyplot as plt
 import streamlit as st
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -9,6 +11,7 @@ from dotenv import load_dotenv
 import july
 from july.utils import date_range
 from nutrition import calculate_daily_totals, get_consumed_foods
+from trends import compute_trends
 
 # Load environment variables
 load_dotenv(dotenv_path=".env")
@@ -45,29 +48,37 @@ def dashboard():
         st.warning("Please log in first.")
         return
 
-    # Access user_email from session state
+    # Fetch user profile and food data
     user_email = st.session_state.user_email
-
-    # Retrieve data based on the user's email
+    user_profile = user_collection.find_one({"email": user_email})
     records = food_collection.find({"user_email": user_email})
-    new_user = pd.DataFrame(records)
+    data = pd.DataFrame(records)
 
     # Check if data is empty
-    if new_user.empty:
+    if data.empty:
         st.info("No food data available. Start logging your meals!")
         return
 
-    # Fetch user profile and food data
-    user_email = st.session_state["user_email"]
-    user_profile = user_collection.find_one({"email": user_email})
-    records = food_collection.find({"user_email": user_email})
-    data = pd.DataFrame(records)
-
     # Display user dashboard
     st.title(f"{user_profile.get('username', 'User')} Nutrition Dashboard")
     st.write(f"Logged in as: {user_email}")
 
-    # Profile update section
+    # Calculate limits from the saved profile
+    calorie_limit = int(user_profile.get("calorie_limit", 0))
+    gender = user_profile.get("gender", "Male")
+    sugar_limit = 36 if gender == "Male" else 25
+
+    trends = compute_trends(data, calorie_limit, sugar_limit)
+
+    # Each section is a fragment, so interacting with one only reruns that section
+    profile_section(user_email, user_profile)
+    summary_section(user_email, calorie_limit, sugar_limit)
+    charts_section(trends)
+    heatmap_section(trends["daily"]["calories"])
+
+
+@st.fragment
+def profile_section(user_email, user_profile):
     col1, col2, col3, col4 = st.columns(4)
     with col1:
         height = st.number_input("Height (cm)", value=int(user_profile.get("height", 0)), step=1)
@@ -88,22 +99,26 @@ def dashboard():
             {"email": user_email},
             {
                 "$set": {
-                    "height": str(height),
-                    "weight": str(weight),
+                    "height": float(height),
+                    "weight": float(weight),
                     "activity_level": activity_level,
                     "calorie_limit": calorie_limit
                 }
             }
         )
         if update_result.modified_count > 0:
-            st.success("Profile updated successfully!")
+            # The other sections depend on the saved limits, so rerun the whole page
+            st.session_state["profile_updated"] = True
+            st.rerun()
         else:
             st.info("No changes were made.")
 
-    # Calculate limits and totals
-    gender = user_profile.get("gender", "Male")
-    sugar_limit = 36 if gender == "Male" else 25
+    if st.session_state.pop("profile_updated", False):
+        st.success("Profile updated successfully!")
+
 
+@st.fragment
+def summary_section(user_email, calorie_limit, sugar_limit):
     foods_data, display_foods = get_consumed_foods(user_email)
     totals = calculate_daily_totals(foods_data)
 
@@ -114,11 +129,6 @@ def dashboard():
     with col2:
         st.plotly_chart(generate_pie_chart("Sugar", sugar_limit, totals["total_sugar"]))
 
-    # Daily Calories Line Chart
-    data["date"] = pd.to_datetime(data["date"], format="%d/%m/%Y")
-    daily_calories = data.groupby("date")["calories"].sum().reset_index()
-    st.line_chart(daily_calories.set_index("date"))
-
     # Nutritional Balance Radar Chart
     nutrient_limits = {
         "Sugar": sugar_limit,
@@ -126,20 +136,13 @@ def dashboard():
         "Protein": 60,
         "Fat": 70
     }
-    # consumed_nutrients = {
-    #     "Sugar": totals["total_sugar"],
-    #     "Carbs": totals["total_carbs"],
-    #     "Protein": totals["total_protein"],
-    #     "Fat": totals["total_fat"]
-    # }
 
     consumed_nutrients = {
-    "Sugar": round(totals["total_sugar"], 2),
-    "Carbs": round(totals["total_carbs"], 2),
-    "Protein": round(totals["total_protein"], 2),
-    "Fat": round(totals["total_fat"], 2)
-}
-
+        "Sugar": round(totals["total_sugar"], 2),
+        "Carbs": round(totals["total_carbs"], 2),
+        "Protein": round(totals["total_protein"], 2),
+        "Fat": round(totals["total_fat"], 2)
+    }
 
     col1, col2 = st.columns([2,1])
     with col1:
@@ -159,48 +162,41 @@ def dashboard():
     else:
         st.success("Great job! You are within your nutritional limits.")
 
-    data["date"] = pd.to_datetime(data["date"])
+
+@st.fragment
+def charts_section(trends):
+    # Daily Calories Line Chart
+    st.line_chart(trends["daily"][["calories"]])
+
+    # Weekly / Monthly Trends
+    show_trends(trends)
+
+
+@st.fragment
+def heatmap_section(daily_calories):
+    st.image(render_heatmap(daily_calories))
+
+
+@st.cache_data(max_entries=32)
+def render_heatmap(daily_calories):
+    # Cached on the daily calorie series, so the figure is only redrawn when it changes
 
     # Define the current date and calculate six months ago
     today = datetime.today()
     six_months_ago = today - timedelta(days=6 * 30)
 
     # Generate a full date range for the past six months
-    full_date_range = pd.date_range(six_months_ago, today, freq="D")
-
-    # Group by date and sum calories (strip time to match granularity)
-    data["date"] = data["date"].dt.date  # Keep only the date part
-    daily_calories = (
-        data.groupby("date")["calories"]
-        .sum()
-        .reset_index()
-        .rename(columns={"calories": "daily_calories"})
-    )
+    full_date_range = pd.date_range(six_months_ago, today, freq="D").normalize()
 
-    # Create a DataFrame for the full date range
-    full_date_range_df = pd.DataFrame({"date": full_date_range})
-    full_date_range_df["date"] = full_date_range_df["date"].dt.date  # Keep only the date part
-
-    # Merge the full date range with daily calorie data
-    merged_daily_calories = (
-        full_date_range_df
-        .merge(daily_calories, on="date", how="left")
-        .fillna(0)  
-    )
+    # Fill days without entries with 0
+    merged_daily_calories = daily_calories.reindex(full_date_range, fill_value=0).astype(int)
 
-    merged_daily_calories["daily_calories"] = merged_daily_calories["daily_calories"].astype(int)
-
-    # Print outputs
-    # print("Full Date Range (Head):\n", full_date_range_df.head())
-    # print("\nDaily Calories (Merged):\n", merged_daily_calories.tail())
-    # print("\nToday's Total Calories:\n", daily_calories.loc[daily_calories["date"] == today.date(), "daily_calories"].sum())
-
-    max_calories = merged_daily_calories["daily_calories"].max()
-    merged_daily_calories["normalized_calories"] = merged_daily_calories["daily_calories"] / max_calories
+    max_calories = merged_daily_calories.max()
+    normalized_calories = merged_daily_calories / max_calories
 
     # Extract date and normalized calorie values
-    heatmap_dates = merged_daily_calories["date"]
-    heatmap_values = merged_daily_calories["normalized_calories"].values
+    heatmap_dates = merged_daily_calories.index.date
+    heatmap_values = normalized_calories.values
 
     # Create the heatmap
     heatmap = july.heatmap(
@@ -209,7 +205,34 @@ def dashboard():
         title="Calorie Consumption",
         cmap="github"
     )
-    st.pyplot(heatmap.get_figure())
+    figure = heatmap.get_figure()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+def show_trends(trends):
+    st.header("Trends")
+
+    over_limit = trends["days_over_limit"]
+    over_limit_30d = trends["days_over_limit_30d"]
+    col1, col2 = st.columns(2)
+    col1.metric("Days Over Calorie Limit (30d)", over_limit_30d["calories"], f"{over_limit['calories']} all time", delta_color="off")
+    col2.metric("Days Over Sugar Limit (30d)", over_limit_30d["sugar"], f"{over_limit['sugar']} all time", delta_color="off")
+
+    st.subheader("Rolling Average Calories")
+    st.line_chart(trends["rolling"][["calories_7d", "calories_30d"]])
+
+    period = st.radio("Group by", ["Weekly", "Monthly"], horizontal=True)
+    totals = trends["weekly"] if period == "Weekly" else trends["monthly"]
+    ratios = trends["weekly_ratios"] if period == "Weekly" else trends["monthly_ratios"]
+
+    st.subheader(f"{period} Macro Totals")
+    st.bar_chart(totals[["carbs", "protein", "fat", "sugar"]])
+
+    st.subheader(f"{period} Macro Energy Split")
+    st.bar_chart(ratios)
 
 
 def generate_pie_chart(title, limit, consumed):
@@ -1,15 +1,14 @@
 import streamlit as st
-import pytesseract
-from PIL import Image
-import cv2
 import os
-import numpy as np
 import matplotlib.pyplot as plt
 from dotenv import load_dotenv
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from llm_replay import get_chat_model
 import google.generativeai as genai
+from ingredients import prepare_ingredients, clean_ocr_text
+from additives import score_ingredients
+from ocr import extract_texts
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +35,7 @@ def find_quality(ingredients):
     prompt = PromptTemplate(template=template, input_variables=["ingredients"])
 
     try:
-        model = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
+        model = get_chat_model(model="gemini-pro", temperature=0.3)
         llm_chain = LLMChain(llm=model, prompt=prompt)
         response = llm_chain.run(ingredients=ingredients)
 
@@ -59,29 +58,76 @@ def find_quality(ingredients):
         st.error(f"Error generating health rating: {e}")
         return None
 
+class LabelReadError(Exception):
+    # Carries the (text, error) pair of every image in the batch
+    def __init__(self, results):
+        super().__init__("some images could not be read")
+        self.results = results
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def read_labels(images):
+    # Cached on the image bytes so reruns don't OCR the same labels again.
+    # st.cache_data doesn't keep exceptions, so a batch with an unreadable
+    # image is read again on the next attempt instead of being cached
+    results = extract_texts(images)
+    if any(error for _, error in results):
+        raise LabelReadError(results)
+    return results
+
+
 # Main function for the Streamlit app
 def health():
     st.title("Food Product Health Rating ")
-    st.write("Upload an image of a food product's ingredient list to rate its health quality based on the ingredients.")
+    st.write("Upload images of a food product's labels (front, back, nutrition panel) to rate its health quality based on the ingredients.")
 
-    # File uploader to upload an image
-    uploaded_file = st.file_uploader("Choose an image file", type=["jpg", "jpeg", "png"])
+    # File uploader to upload one or more images of the same product
+    uploaded_files = st.file_uploader("Choose image files", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+
+    if uploaded_files:
+        # Extract text from all images at once, OCR runs in a process pool
+        with st.spinner(f"Reading {len(uploaded_files)} image(s)..."):
+            try:
+                results = read_labels(tuple(file.getvalue() for file in uploaded_files))
+            except LabelReadError as e:
+                results = e.results
+
+        # Report images that couldn't be read and rate the rest
+        failed = False
+        for uploaded_file, (text, error) in zip(uploaded_files, results):
+            if error:
+                failed = True
+                st.error(f"Could not read {uploaded_file.name}: {error}")
+
+        extracted_texts = [text for text, error in results if not error]
 
-    if uploaded_file is not None:
-        # Display the uploaded image
-        image = Image.open(uploaded_file)
-        
-        # Convert image to OpenCV format for processing
-        opencv_image = np.array(image)
-        opencv_image = cv2.cvtColor(opencv_image, cv2.COLOR_RGB2BGR)
-        
-        # Extract text from the image using OCR
-        extracted_text = pytesseract.image_to_string(opencv_image)
-        
         # Check if any text was extracted
-        if extracted_text.strip():
+        if any(text.strip() for text in extracted_texts):
             st.write("*Health Rating Based on Ingredients:*")
-            rating_result = find_quality(extracted_text)
+
+            # Only send the ingredients section to the model, not the whole label
+            ingredients, stats = prepare_ingredients([text for text in extracted_texts if text.strip()])
+            if stats["found"]:
+                st.caption(
+                    f"Ingredients section found: ~{stats['prompt_tokens']} of ~{stats['full_tokens']} tokens sent "
+                    f"({stats['reduction']:.0%} reduction)."
+                )
+            else:
+                st.caption("No ingredients section found, using the full label text.")
+
+            # Instant local score from known additives, shown while the model responds.
+            # Scans every label in full, additives may sit outside the extracted section
+            full_text = "\n".join(line for text in extracted_texts for line in clean_ocr_text(text))
+            preliminary_score, flagged = score_ingredients(full_text)
+            st.metric("Preliminary Rating (additives)", f"{preliminary_score}/100")
+            if flagged:
+                st.write("### Flagged Ingredients:")
+                st.table(flagged)
+            else:
+                st.write("No known additives of concern found.")
+
+            with st.spinner("Getting a detailed review..."):
+                rating_result = find_quality(ingredients)
             
             # Parse the dictionary result if it's not empty
             if rating_result:
@@ -138,8 +184,8 @@ def health():
 
             else:
                 st.error("Received an empty response. Please try again.")
-        else:
-            st.error("No text detected in the image. Please try with a clearer image.")
+        elif not failed:
+            st.error("No text detected in the images. Please try with clearer images.")
 
 # Run the health function if the script is executed
 if __name__ == "__main__":
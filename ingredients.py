@@ -0,0 +1,163 @@
+import re
+
+# Anchors that open the ingredients section, the weaker ones are only tried when
+# no label says "ingredients" since they also show up in marketing copy
+START_ANCHORS = [
+    re.compile(r"\b(?:ingredients?|ingred[il1]ents?)\b\s*(:)?", re.IGNORECASE),
+    re.compile(r"\b(?:composition|made\s+with)\b\s*(:)?", re.IGNORECASE),
+]
+
+# Headers that usually follow the ingredients section on a label, only at the start
+# of a line or a sentence so "Energy blend" inside the list doesn't end it. Single
+# words also need a ":", a number or per/facts/information after them
+STOP_ANCHORS = re.compile(
+    r"(?:^|[.!?)\]])\s*(?P<header>"
+    r"(?:manufactured\s+(?:by|for)|marketed\s+by|packed\s+(?:by|on)|store\s+(?:in|at|below)|"
+    r"storage\s+(?:instructions?|conditions?)|customer\s+care|best\s+before|use\s+by|"
+    r"net\s+(?:wt|weight|qty|quantity)|lot\s+no|batch\s+no|serving\s+size|www\.|https?:)|"
+    r"(?:nutrition(?:al)?(?:\s+(?:information|facts|values?))?|energy|mfd|mfg|exp(?:iry)?(?:\s+date)?|"
+    r"storage|batch|fssai|tel|phone|e-?mail|address|manufactured|marketed)"
+    r"\b(?=\s*(?::|\d|per\b|facts\b|information\b))"
+    r")",
+    re.IGNORECASE,
+)
+
+# Allergen statements belong with the ingredients, so they don't end the section
+ALLERGEN_LINE = re.compile(r"^\s*(contains|may\s+contain|allergen)", re.IGNORECASE)
+
+MAX_SECTION_LINES = 25
+
+
+def clean_ocr_text(text):
+    # Re-join words hyphenated across line breaks and drop unprintable characters
+    text = re.sub(r"(\w)-\s*\n\s*(\w)", r"\1\2", text)
+    text = re.sub(r"[^\x20-\x7E\n]", " ", text)
+
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[|_~`^*#<>\\]+", " ", line)
+        line = re.sub(r"\s+", " ", line).strip()
+        if is_noise(line):
+            continue
+        lines.append(line)
+    return lines
+
+
+def is_noise(line):
+    # OCR garbage: very short fragments or lines that are mostly symbols
+    if len(line) < 3:
+        return True
+    alphanumeric = sum(c.isalnum() for c in line)
+    return alphanumeric / len(line) < 0.5
+
+
+def normalize_ingredients(text):
+    text = re.sub(r"\s*;\s*", ", ", text)
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r",(\s*,)+", ",", text)
+    text = re.sub(r"([(\[])\s+", r"\1", text)
+    text = re.sub(r"\s+([)\]])", r"\1", text)
+    text = re.sub(r"\s+\.", ".", text)
+    text = re.sub(r"\.(\s*\.)+", ".", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,.:;-")
+
+
+def cut_at_stop(line):
+    # Returns the part of the line before any stop anchor, and whether one was found
+    match = STOP_ANCHORS.search(line)
+    if match:
+        return line[:match.start("header")], True
+    return line, False
+
+
+def find_anchor(lines, anchor):
+    # First anchor followed by a colon or a comma separated list
+    for start, line in enumerate(lines):
+        for match in anchor.finditer(line):
+            rest, _ = cut_at_stop(line[match.end():])
+            if not rest.strip() and start + 1 < len(lines):
+                rest, _ = cut_at_stop(lines[start + 1])
+            if match.group(1) or "," in rest:
+                return start, match.end()
+    return None
+
+
+def extract_ingredients(text):
+    # Returns the ingredients section, or None when no anchor is found
+    lines = clean_ocr_text(text)
+
+    for anchor in START_ANCHORS:
+        found = find_anchor(lines, anchor)
+        if found:
+            break
+    else:
+        return None
+
+    start, offset = found
+    remainder, stopped = cut_at_stop(lines[start][offset:])
+    section = [remainder]
+    if not stopped:
+        for following in lines[start + 1:start + 1 + MAX_SECTION_LINES]:
+            if ALLERGEN_LINE.match(following):
+                section.append(". " + following)
+                continue
+            following, stopped = cut_at_stop(following)
+            section.append(following)
+            if stopped:
+                break
+
+    return normalize_ingredients(" ".join(section)) or None
+
+
+def estimate_tokens(text):
+    # Rough token count (~4 characters per token), good enough to compare prompts
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def split_ingredients(section):
+    # Split on top-level commas only, "Emulsifier (E322, E471)" stays one item
+    items, current, depth = [], [], 0
+    for char in section:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(0, depth - 1)
+        elif char == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    items.append("".join(current).strip())
+    return [item for item in items if item]
+
+
+def merge_ingredients(sections):
+    # One list from several labels of the same product, without repeats
+    seen = set()
+    merged = []
+    for section in sections:
+        for item in split_ingredients(section):
+            if item.lower() not in seen:
+                seen.add(item.lower())
+                merged.append(item)
+    return ", ".join(merged)
+
+
+def prepare_ingredients(texts):
+    # Pick the text to send to the model from one or more OCR'd labels and
+    # report how much was trimmed
+    full_text = "\n".join(texts)
+    sections = [section for section in map(extract_ingredients, texts) if section]
+    prompt_text = merge_ingredients(sections) if sections else full_text
+
+    full_tokens = estimate_tokens(full_text)
+    prompt_tokens = estimate_tokens(prompt_text)
+    reduction = 1 - prompt_tokens / full_tokens if full_tokens else 0
+
+    return prompt_text, {
+        "found": bool(sections),
+        "full_tokens": full_tokens,
+        "prompt_tokens": prompt_tokens,
+        "reduction": reduction,
+    }
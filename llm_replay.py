@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from string import Template
+from typing import Any, List, Optional
+from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+load_dotenv()
+
+# LLM_MODE is one of:
+#   live   - call Gemini directly (default)
+#   record - call Gemini and save every response to LLM_CASSETTE
+#   replay - serve responses from LLM_CASSETTE, no network needed
+
+# Canned responses used in replay mode when the cassette has no exact match,
+# one per prompt in nutrition.py and health_safety.py. Named groups of the
+# pattern are substituted into the response ($item, $date).
+DEFAULT_PATTERNS = [
+    {
+        "pattern": r'"date": "(?P<date>[^"]*)",\s*"item": "(?P<item>[^"]*)"',
+        "response": '{"date": "$date", "item": "$item", "calories": 95, "sugar_content": 19, '
+                    '"carbs": 25, "protein": 0.5, "fat": 0.3}',
+    },
+    {
+        "pattern": r"What is the calorie content of (?P<item>.+?)\?",
+        "response": "95",
+    },
+    {
+        "pattern": r"ingredients of a packed food product",
+        "response": '{"health_rating": 55, "sugar_content": 30, "preservatives": 10, "nutritional_value": 40, '
+                    '"health_issues": ["High sugar content"], '
+                    '"Justification": ["Replayed response, no model was called"]}',
+    },
+]
+
+_cassette_lock = threading.Lock()
+_cassettes = {}
+
+
+class ReplayError(Exception):
+    pass
+
+
+def prompt_key(messages):
+    text = "\n".join(str(message.content) for message in messages)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_cassette(path):
+    with _cassette_lock:
+        if path not in _cassettes:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    _cassettes[path] = json.load(f)
+            else:
+                _cassettes[path] = {"responses": {}, "patterns": []}
+        return _cassettes[path]
+
+
+def save_response(path, messages, response):
+    cassette = load_cassette(path)
+    with _cassette_lock:
+        cassette["responses"][prompt_key(messages)] = {
+            "prompt": "\n".join(str(message.content) for message in messages),
+            "response": response,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def find_response(path, messages):
+    cassette = load_cassette(path)
+    recorded = cassette["responses"].get(prompt_key(messages))
+    if recorded:
+        return recorded["response"]
+
+    text = "\n".join(str(message.content) for message in messages)
+    for entry in cassette.get("patterns", []) + DEFAULT_PATTERNS:
+        match = re.search(entry["pattern"], text, re.DOTALL)
+        if match:
+            # Escape captured values so they stay valid inside JSON responses
+            values = {k: json.dumps(v)[1:-1] for k, v in match.groupdict().items() if v is not None}
+            return Template(entry["response"]).safe_substitute(values)
+
+    raise ReplayError("No recorded response for this prompt.")
+
+
+class RecordingChatModel(BaseChatModel):
+    model: BaseChatModel
+    cassette: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result = self.model._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        save_response(self.cassette, messages, result.generations[0].message.content)
+        return result
+
+
+class ReplayChatModel(BaseChatModel):
+    cassette: str
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if random.random() < self.error_rate:
+            raise ReplayError("Injected error from the replay model.")
+
+        response = find_response(self.cassette, messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))])
+
+
+def get_chat_model(**kwargs):
+    # Drop-in replacement for ChatGoogleGenerativeAI(...) that honours LLM_MODE
+    mode = os.getenv("LLM_MODE", "live")
+    cassette = os.getenv("LLM_CASSETTE", "llm_cassette.json")
+
+    if mode == "replay":
+        return ReplayChatModel(
+            cassette=cassette,
+            latency=float(os.getenv("LLM_REPLAY_LATENCY", 0)),
+            jitter=float(os.getenv("LLM_REPLAY_JITTER", 0)),
+            error_rate=float(os.getenv("LLM_REPLAY_ERROR_RATE", 0)),
+        )
+
+    model = ChatGoogleGenerativeAI(**kwargs)
+    if mode == "record":
+        return RecordingChatModel(model=model, cassette=cassette)
+    return model
@@ -0,0 +1,178 @@
+import os
+import math
+import time
+import logging
+import argparse
+import multiprocessing
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Simulated sessions run fully offline: Gemini is replaced by the replay model
+# and MongoDB by an in-memory mongomock client shared by every module. Each
+# session runs in a worker process since AppTest is not safe to share across
+# threads, so every worker has its own in-memory database.
+os.environ["LLM_MODE"] = "replay"
+os.environ.setdefault("MONGO_CLIENT", "mongodb://localhost")
+os.environ.setdefault("DATABASE", "nutritionaist_loadtest")
+os.environ.setdefault("USER_COLLECTION", "users")
+os.environ.setdefault("FOOD_COLLECTION", "foods")
+
+import mongomock
+import pymongo
+
+shared_client = mongomock.MongoClient()
+pymongo.MongoClient = lambda *args, **kwargs: shared_client
+
+# Streamlit warns about missing script context for calls made outside AppTest
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+# Import every page module now so they all bind to shared_client; AppTest
+# reuses these cached modules when it runs app.py
+from streamlit.testing.v1 import AppTest
+import auth
+import dash
+import nutrition
+import health_safety
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PASSWORD = "loadtest-password"
+SAMPLE_LABEL = """Ingredients: Wheat flour, Sugar, Palm oil, Cocoa solids (5%),
+Emulsifier (E322), Raising agent (E500), Salt, Artificial flavour
+Nutritional information per 100g"""
+
+
+@lru_cache(maxsize=1)
+def hashed_password():
+    return auth.hash_password(PASSWORD)
+
+
+def seed_user(i):
+    email = f"loadtest{i}@example.com"
+    auth.users_collection.delete_many({"email": email})
+    auth.users_collection.insert_one({
+        "username": f"loadtest{i}",
+        "email": email,
+        "gender": "Male" if i % 2 else "Female",
+        "height": "170",
+        "weight": "70",
+        "activity_level": "Moderately active",
+        "calorie_limit": 2200,
+        "password": hashed_password(),
+    })
+    return email
+
+
+def find_button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def run_session(i, timeout):
+    email = seed_user(i)
+    timings = []
+    errors = []
+
+    def step(name, action):
+        start = time.perf_counter()
+        try:
+            action()
+            if at.exception:
+                errors.append(f"{name}: {at.exception[0].message}")
+            elif at.error:
+                errors.append(f"{name}: {at.error[0].value}")
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+        timings.append((name, time.perf_counter() - start))
+
+    def login():
+        at.run()
+        at.text_input[0].input(email)
+        at.text_input[1].input(PASSWORD)
+        find_button(at, "Log In").click().run()
+        # login() only sets session state, the navigation shows on the next run
+        at.run()
+
+    def nutritionist():
+        at.sidebar.radio[0].set_value("Nutritionist").run()
+        at.text_input[0].input("1 apple")
+        find_button(at, "Add to Consumed List").click().run()
+
+    def rate_label():
+        # AppTest can't drive st.file_uploader, so the rating call is made directly
+        if health_safety.find_quality(SAMPLE_LABEL) is None:
+            raise RuntimeError("find_quality returned no rating")
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    step("Login", login)
+    if not at.session_state["logged_in"]:
+        errors.append("Login: session was not logged in")
+        return timings, errors
+
+    step("Nutritionist", nutritionist)
+    step("Dashboard", lambda: at.sidebar.radio[0].set_value("Dashboard").run())
+    step("Food Quality", lambda: at.sidebar.radio[0].set_value("Food Quality").run())
+    step("Food Quality rating", rate_label)
+    return timings, errors
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def report(results, wall_time):
+    page_times = defaultdict(list)
+    errors = []
+    for timings, session_errors in results:
+        for name, elapsed in timings:
+            page_times[name].append(elapsed)
+        errors.extend(session_errors)
+
+    page_loads = sum(len(times) for times in page_times.values())
+    print(f"\nSessions: {len(results)} in {wall_time:.2f}s")
+    print(f"Throughput: {len(results) / wall_time:.2f} sessions/s, {page_loads / wall_time:.2f} page loads/s")
+    print(f"Errors: {len(errors)}")
+
+    print(f"\n{'Page':<22}{'count':>8}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for name, times in page_times.items():
+        print(f"{name:<22}{len(times):>8}{percentile(times, 50) * 1000:>12.1f}{percentile(times, 99) * 1000:>12.1f}")
+
+    for error in errors[:10]:
+        print(f"  - {error}")
+    if len(errors) > 10:
+        print(f"  ... and {len(errors) - 10} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive simulated NutritionAIst sessions without network access.")
+    parser.add_argument("--sessions", type=int, default=20, help="Total number of simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=5, help="Sessions running at the same time")
+    parser.add_argument("--latency", type=float, default=0.5, help="Replay model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Random extra replay latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of model calls that fail")
+    parser.add_argument("--cassette", default=os.getenv("LLM_CASSETTE", "llm_cassette.json"),
+                        help="Recorded responses, see LLM_MODE=record")
+    parser.add_argument("--timeout", type=float, default=60, help="Per page timeout in seconds")
+    args = parser.parse_args()
+
+    os.environ["LLM_CASSETTE"] = args.cassette
+    os.environ["LLM_REPLAY_LATENCY"] = str(args.latency)
+    os.environ["LLM_REPLAY_JITTER"] = str(args.jitter)
+    os.environ["LLM_REPLAY_ERROR_RATE"] = str(args.error_rate)
+
+    results = []
+    start = time.perf_counter()
+    # Workers are spawned, forking after grpc and Streamlit start threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.concurrency, mp_context=context) as executor:
+        # AppTest replaces __main__ inside the workers, so refer to this module by name
+        import loadtest
+        futures = [executor.submit(loadtest.run_session, i, args.timeout) for i in range(args.sessions)]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print(f"Completed {len(results)}/{args.sessions} sessions", end="\r")
+    report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
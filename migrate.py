@@ -0,0 +1,109 @@
+import os
+import time
+import argparse
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from dotenv import load_dotenv
+from schema import typed_food_fields, typed_user_fields
+
+# Rewrites legacy documents with typed fields:
+#   food: "date" string -> datetime, nutrient strings ("12 g") -> float
+#   user: "height" / "weight" strings -> float
+# The original values are kept under "legacy.<field>" so a run can be audited
+# or reversed. Values that aren't a single number stay as they are.
+#
+# Documents are read in _id order one batch at a time and the last migrated
+# _id is stored in the migrations collection, so an interrupted run resumes
+# where it stopped. Each update only applies if the document still holds the
+# old value, so it is safe to run while the app is writing.
+load_dotenv()
+MONGO_CLIENT = os.getenv("MONGO_CLIENT")
+DATABASE = os.getenv("DATABASE")
+USER_COLLECTION = os.getenv("USER_COLLECTION")
+FOOD_COLLECTION = os.getenv("FOOD_COLLECTION")
+MIGRATION_COLLECTION = os.getenv("MIGRATION_COLLECTION", "migrations")
+
+MIGRATION_NAME = "typed_fields"
+
+
+def migrate_collection(collection, progress_collection, convert, batch_size=500, dry_run=False):
+    progress_id = f"{MIGRATION_NAME}:{collection.name}"
+    progress = progress_collection.find_one({"_id": progress_id}) or {}
+    if progress.get("done"):
+        print(f"{collection.name}: already migrated, use --restart to run again")
+        return progress
+
+    last_id = progress.get("last_id")
+    scanned = progress.get("scanned", 0)
+    modified = progress.get("modified", 0)
+    started = time.perf_counter()
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = list(collection.find(query).sort("_id", ASCENDING).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for document in batch:
+            changes = convert(document)
+            if changes:
+                # Only update if the fields still hold the values we converted
+                current = {field: document[field] for field in changes}
+                legacy = {f"legacy.{field}": value for field, value in current.items()}
+                operations.append(UpdateOne({"_id": document["_id"], **current}, {"$set": {**changes, **legacy}}))
+
+        if operations and not dry_run:
+            result = collection.bulk_write(operations, ordered=False)
+            modified += result.modified_count
+        elif dry_run:
+            modified += len(operations)
+
+        last_id = batch[-1]["_id"]
+        scanned += len(batch)
+        if not dry_run:
+            progress_collection.update_one(
+                {"_id": progress_id},
+                {"$set": {"last_id": last_id, "scanned": scanned, "modified": modified, "updated_at": datetime.now()}},
+                upsert=True
+            )
+
+        rate = scanned / max(time.perf_counter() - started, 1e-9)
+        print(f"{collection.name}: scanned {scanned}, modified {modified} ({rate:.0f} docs/s)", end="\r")
+
+    if not dry_run:
+        progress_collection.update_one(
+            {"_id": progress_id},
+            {"$set": {"done": True, "scanned": scanned, "modified": modified, "updated_at": datetime.now()}},
+            upsert=True
+        )
+    print(f"{collection.name}: scanned {scanned}, modified {modified}{' (dry run)' if dry_run else ''}")
+    return {"scanned": scanned, "modified": modified}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate food and user documents to typed fields.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents read and written per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Count documents to convert without writing")
+    parser.add_argument("--restart", action="store_true", help="Forget saved progress and scan from the start")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_CLIENT)
+    db = client[DATABASE]
+    progress_collection = db[MIGRATION_COLLECTION]
+    food_collection = db[FOOD_COLLECTION]
+    user_collection = db[USER_COLLECTION]
+
+    if args.restart and not args.dry_run:
+        progress_collection.delete_many({"_id": {"$regex": f"^{MIGRATION_NAME}:"}})
+
+    # Today's foods are queried by user and date range once dates are typed
+    if not args.dry_run:
+        food_collection.create_index([("user_email", ASCENDING), ("date", ASCENDING)])
+
+    migrate_collection(food_collection, progress_collection, typed_food_fields, args.batch_size, args.dry_run)
+    migrate_collection(user_collection, progress_collection, typed_user_fields, args.batch_size, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
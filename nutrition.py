@@ -5,8 +5,9 @@ from pymongo import MongoClient
 from dotenv import load_dotenv
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from langchain_google_genai import ChatGoogleGenerativeAI
-from datetime import datetime
+from llm_replay import get_chat_model
+from datetime import datetime, timedelta
+from schema import FOOD_NUMERIC_FIELDS, DATE_FORMAT, to_float
 
 
 load_dotenv()
@@ -23,6 +24,11 @@ def add_to_mongo(food_data, user_email):
     try:
         
         food_data["user_email"] = user_email
+        # Store typed values so readers don't have to parse them. The date is
+        # taken from the server, not whatever format the model echoed back
+        food_data["date"] = datetime.combine(datetime.now().date(), datetime.min.time())
+        for field in FOOD_NUMERIC_FIELDS:
+            food_data[field] = to_float(food_data[field])
         food_collection.insert_one(food_data)
         st.success("Food data successfully added to the database.")
 
@@ -33,12 +39,16 @@ def add_to_mongo(food_data, user_email):
 
 def get_consumed_foods(email):
     try:
-        today = datetime.now().strftime("%d/%m/%Y")
-        # Get all documents for the user from today
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        # Get all documents for the user from today, including legacy
+        # documents that still store the date as a string (see migrate.py)
         foods = list(food_collection.find(
             {
-                "date": today,
-                "user_email": email
+                "user_email": email,
+                "$or": [
+                    {"date": {"$gte": today, "$lt": today + timedelta(days=1)}},
+                    {"date": today.strftime(DATE_FORMAT)}
+                ]
             },
             {"_id": 0}
         ))
@@ -67,7 +77,7 @@ def find_calorie(food_item):
     template = "What is the calorie content of {food_item}? Provide only the numeric value."
     prompt = PromptTemplate(template=template, input_variables=["food_item"])
     try:
-        model = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
+        model = get_chat_model(model="gemini-pro", temperature=0.3)
         chain = LLMChain(llm=model, prompt=prompt)
         result = chain.run(food_item=food_item)
         # Clean the result to get only numeric value
@@ -78,7 +88,7 @@ def find_calorie(food_item):
     
 
 def extract_calories(food_item):
-    date = datetime.now().strftime("%d/%m/%Y")
+    date = datetime.now().strftime(DATE_FORMAT)
     
     # Modified template to ensure numeric values without units in JSON
     template = """
@@ -101,7 +111,7 @@ def extract_calories(food_item):
     )
 
     try:
-        model = ChatGoogleGenerativeAI(model="gemini-pro", temperature=0.3)
+        model = get_chat_model(model="gemini-pro", temperature=0.3)
         llm_chain = LLMChain(llm=model, prompt=prompt)
         result = llm_chain.run(food_item=food_item, date=date)
 
@@ -143,24 +153,21 @@ def calculate_daily_totals(foods):
     
     for food in foods:
         try:
-            
-            def extract_number(value):
-                if isinstance(value, (int, float)):
-                    return float(value)
-                elif isinstance(value, str):
-                    
-                    return float(''.join(c for c in value if c.isdigit() or c == '.'))
-                return 0
-
-            totals["total_calories"] += extract_number(food["calories"])
-            totals["total_carbs"] += extract_number(food["carbs"])
-            totals["total_protein"] += extract_number(food["protein"])
-            totals["total_fat"] += extract_number(food["fat"])
-            totals["total_sugar"] += extract_number(food["sugar_content"])
-                    
+            # Parse every field first so an invalid entry is skipped as a whole
+            calories = to_float(food["calories"])
+            carbs = to_float(food["carbs"])
+            protein = to_float(food["protein"])
+            fat = to_float(food["fat"])
+            sugar = to_float(food["sugar_content"])
         except (ValueError, KeyError) as e:
             st.warning(f"Skipping invalid entry: {food.get('item', 'unknown food')}")
             continue
+
+        totals["total_calories"] += calories
+        totals["total_carbs"] += carbs
+        totals["total_protein"] += protein
+        totals["total_fat"] += fat
+        totals["total_sugar"] += sugar
     
     return totals
 
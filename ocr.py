@@ -0,0 +1,82 @@
+import io
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image, UnidentifiedImageError
+
+# Kept free of Streamlit and LangChain imports so pool workers start quickly
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def extract_text(image_bytes):
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+
+    # Convert image to OpenCV format for processing
+    opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    return pytesseract.image_to_string(opencv_image)
+
+
+def describe_error(error):
+    if isinstance(error, UnidentifiedImageError):
+        return "not a readable image"
+    return str(error) or type(error).__name__
+
+
+def try_extract_text(image_bytes):
+    try:
+        return extract_text(image_bytes), None
+    except Exception as e:
+        return "", describe_error(e)
+
+
+def get_pool():
+    global _pool
+    # Each Streamlit session runs on its own thread, so only one may create the pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn instead of fork, the Streamlit server process is multithreaded
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=context)
+        return _pool
+
+
+def reset_pool(pool):
+    # Drop a broken pool so the next upload starts a fresh one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_texts(images):
+    # Returns a (text, error) pair per image, so one unreadable image doesn't
+    # fail the others. Tesseract is CPU bound, so each image gets its own process
+    if len(images) == 1 or OCR_WORKERS < 2:
+        return [try_extract_text(image) for image in images]
+
+    pool = get_pool()
+    try:
+        futures = [pool.submit(extract_text, image) for image in images]
+    except BrokenProcessPool:
+        reset_pool(pool)
+        return [try_extract_text(image) for image in images]
+
+    results = []
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except BrokenProcessPool:
+            reset_pool(pool)
+            results.append(("", "OCR worker stopped unexpectedly"))
+        except Exception as e:
+            results.append(("", describe_error(e)))
+    return results
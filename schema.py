@@ -0,0 +1,63 @@
+import re
+from datetime import datetime, date
+
+# Legacy food documents store the date as a string in this format
+DATE_FORMAT = "%d/%m/%Y"
+
+FOOD_NUMERIC_FIELDS = ["calories", "sugar_content", "carbs", "protein", "fat"]
+USER_NUMERIC_FIELDS = ["height", "weight"]
+
+NUMBER_WITH_UNIT = re.compile(r"\s*(-?\d+(?:\.\d+)?)\s*[a-zA-Z%]*\s*")
+
+
+def to_float(value):
+    # Raises ValueError for anything that isn't a usable number, readers skip
+    # the whole entry in that case
+    if isinstance(value, (int, float)):
+        if value != value:
+            raise ValueError("missing value")
+        return float(value)
+    elif isinstance(value, str):
+        # A single number with an optional unit such as "12 g" or "150kcal",
+        # anything else ("2-3 g", "12 g (5%)") is left for a person to fix
+        match = NUMBER_WITH_UNIT.fullmatch(value)
+        if match:
+            return float(match.group(1))
+    raise ValueError(f"not a number: {value!r}")
+
+
+def to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    elif isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return datetime.strptime(value.strip(), DATE_FORMAT)
+
+
+def typed_food_fields(food):
+    # Fields of a food document that still need converting, with their typed values
+    changes = {}
+    if isinstance(food.get("date"), str):
+        try:
+            changes["date"] = to_datetime(food["date"])
+        except ValueError:
+            pass
+
+    for field in FOOD_NUMERIC_FIELDS:
+        if isinstance(food.get(field), str):
+            try:
+                changes[field] = to_float(food[field])
+            except ValueError:
+                pass
+    return changes
+
+
+def typed_user_fields(user):
+    changes = {}
+    for field in USER_NUMERIC_FIELDS:
+        if isinstance(user.get(field), str):
+            try:
+                changes[field] = to_float(user[field])
+            except ValueError:
+                pass
+    return changes
@@ -0,0 +1,101 @@
+import pandas as pd
+from schema import DATE_FORMAT, to_float
+
+# Food document field -> column name in the daily series
+NUTRIENT_FIELDS = {
+    "calories": "calories",
+    "carbs": "carbs",
+    "protein": "protein",
+    "fat": "fat",
+    "sugar_content": "sugar",
+}
+
+# kcal per gram, used for the macro energy split
+MACRO_ENERGY = {
+    "carbs": 4,
+    "protein": 4,
+    "fat": 9,
+}
+
+
+def to_numbers(values):
+    # Same parsing rule as calculate_daily_totals (schema.to_float), NaN where it fails
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    def parse(value):
+        try:
+            return to_float(value)
+        except ValueError:
+            return float("nan")
+
+    return values.map(parse).astype(float)
+
+
+def build_daily_series(data, end=None):
+    # Collapse raw food entries into one row per calendar day, with days
+    # without any entry filled in as zeros so rolling windows stay aligned
+    columns = list(NUTRIENT_FIELDS.values())
+    if data.empty or "date" not in data:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="date"), dtype=float)
+
+    frame = pd.DataFrame({"date": pd.to_datetime(data["date"], format=DATE_FORMAT).dt.normalize()})
+    for field, column in NUTRIENT_FIELDS.items():
+        frame[column] = to_numbers(data[field]) if field in data else float("nan")
+
+    # Like calculate_daily_totals, skip entries with a missing or invalid nutrient
+    frame = frame.dropna()
+    if frame.empty:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name="date"), dtype=float)
+
+    daily = frame.groupby("date")[columns].sum()
+    end = pd.Timestamp(end).normalize() if end is not None else max(daily.index.max(), pd.Timestamp.today().normalize())
+    full_range = pd.date_range(daily.index.min(), end, freq="D", name="date")
+    return daily.reindex(full_range, fill_value=0.0)
+
+
+def rolling_averages(daily, windows=(7, 30)):
+    averages = {}
+    for window in windows:
+        rolled = daily.rolling(window, min_periods=1).mean()
+        for column in daily.columns:
+            averages[f"{column}_{window}d"] = rolled[column]
+    return pd.DataFrame(averages, index=daily.index)
+
+
+def resample_totals(daily, freq):
+    # freq follows pandas offset aliases: "W" for weekly, "MS" for monthly
+    return daily.resample(freq).sum()
+
+
+def macro_ratios(totals):
+    # Share of energy coming from each macro, per row
+    energy = pd.DataFrame({
+        macro: totals[macro] * kcal for macro, kcal in MACRO_ENERGY.items()
+    }, index=totals.index)
+    total_energy = energy.sum(axis=1).replace(0, float("nan"))
+    return energy.div(total_energy, axis=0).fillna(0).round(3)
+
+
+def days_over_limit(daily, calorie_limit, sugar_limit):
+    return {
+        "calories": int((daily["calories"] > calorie_limit).sum()) if calorie_limit else 0,
+        "sugar": int((daily["sugar"] > sugar_limit).sum()) if sugar_limit else 0,
+    }
+
+
+def compute_trends(data, calorie_limit, sugar_limit, end=None):
+    daily = build_daily_series(data, end=end)
+    weekly = resample_totals(daily, "W")
+    monthly = resample_totals(daily, "MS")
+
+    return {
+        "daily": daily,
+        "rolling": rolling_averages(daily),
+        "weekly": weekly,
+        "monthly": monthly,
+        "weekly_ratios": macro_ratios(weekly),
+        "monthly_ratios": macro_ratios(monthly),
+        "days_over_limit": days_over_limit(daily, calorie_limit, sugar_limit),
+        "days_over_limit_30d": days_over_limit(daily.tail(30), calorie_limit, sugar_limit),
+    }